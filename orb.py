@@ -1,8 +1,10 @@
 import MetaTrader5 as mt5
-from datetime import datetime, timedelta, time as dtime, timezone
+import numpy as np
+from datetime import date, datetime, timedelta, time as dtime, timezone
 import time
 import logging
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from time import monotonic
 
 try:
@@ -14,7 +16,7 @@ except Exception:
         import pytz  
         TZ_LONDON = pytz.timezone("Europe/London")
     except Exception:
-        raise RuntimeError("Timezone support not available. Install Python 3.9+ (zoneinfo) or 'pytz'.")
+        raise RuntimeError("Timezone support not available. Install Python 3.10+ (zoneinfo) or 'pytz'.")
 
 logging.basicConfig(
     format="%(asctime)s | %(levelname)s | %(message)s",
@@ -23,31 +25,116 @@ logging.basicConfig(
 )
 log = logging.getLogger("orb")
 
-_last_msgs = {}
-_last_time = defaultdict(lambda: 0.0)
+_ACT_PENDING = mt5.TRADE_ACTION_PENDING
+_BUY_STOP    = mt5.ORDER_TYPE_BUY_STOP
+_SELL_STOP   = mt5.ORDER_TYPE_SELL_STOP
+_TIME_GTC    = mt5.ORDER_TIME_GTC
+_TIME_SPEC   = mt5.ORDER_TIME_SPECIFIED
+_FILL_RET    = mt5.ORDER_FILLING_RETURN
+_RC_DONE     = mt5.TRADE_RETCODE_DONE
+
+_RATES_DTYPE = np.dtype([
+    ("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"),
+    ("close", "<f8"), ("tick_volume", "<u8"), ("spread", "<i4"), ("real_volume", "<u8"),
+])
+
+_log_state: dict[str, tuple[str, float]] = {}
 
 def log_once(key: str, message: str, level=logging.INFO, min_interval=30.0):
+    prev = _log_state.get(key)
     now = monotonic()
-    last_m = _last_msgs.get(key)
-    if message != last_m or (now - _last_time[key]) >= min_interval:
-        _last_msgs[key] = message
-        _last_time[key] = now
+    if prev is None or prev[0] != message or (now - prev[1]) >= min_interval:
+        _log_state[key] = (message, now)
         log.log(level, message)
 
 
-def ensure_connected():
-    if not mt5.initialize():
-        raise RuntimeError(f"MT5 initialize failed: {mt5.last_error()}")
-    if not mt5.symbol_select(SYMBOL, True):
+# The MetaTrader5 package is not safe to drive from several threads at once,
+# so every terminal call goes through a single dedicated worker.
+_mt5_exec = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mt5")
+
+def _mt5_call(fn, *args, **kwargs):
+    return _mt5_exec.submit(fn, *args, **kwargs).result()
+
+def submit_order_send(req: dict):
+    return _mt5_exec.submit(mt5.order_send, req)
+
+@dataclass(slots=True)
+class _SymbolCache:
+    point: float
+    digits: int
+    volume_min: float
+    volume_step: float
+    volume_max: float | None
+    filling_mode: int
+    stops_gap: float
+    pend_gap: float
+    tiny: float
+    buf: float
+
+    @classmethod
+    def from_info(cls, info) -> "_SymbolCache":
+        point        = info.point
+        stops_gap    = (info.trade_stops_level  or 0) * point
+        freeze_gap   = (info.trade_freeze_level or 0) * point
+        return cls(
+            point=point,
+            digits=info.digits,
+            volume_min=info.volume_min,
+            volume_step=info.volume_step,
+            volume_max=getattr(info, "volume_max", None),
+            filling_mode=getattr(info, "filling_mode", _FILL_RET) or _FILL_RET,
+            stops_gap=stops_gap,
+            pend_gap=max(stops_gap, freeze_gap),
+            tiny=max(2 * point, 0.0),
+            buf=(BREAK_BUFFER_POINTS or 0) * point,
+        )
+
+_symbol: _SymbolCache | None = None
+
+def ensure_connected() -> _SymbolCache:
+    global _symbol
+    if not _mt5_call(mt5.initialize):
+        raise RuntimeError(f"MT5 initialize failed: {_mt5_call(mt5.last_error)}")
+    if not _mt5_call(mt5.symbol_select, SYMBOL, True):
         raise RuntimeError(f"Cannot select symbol {SYMBOL}")
-    info = mt5.symbol_info(SYMBOL)
+    info = _mt5_call(mt5.symbol_info, SYMBOL)
     if not info or not info.trade_mode:
         raise RuntimeError(f"Symbol not tradeable or no info for {SYMBOL}")
-    return info
+    _symbol = _SymbolCache.from_info(info)
+    return _symbol
+
+def refresh_symbol_cache() -> _SymbolCache:
+    global _symbol
+    info = _mt5_call(mt5.symbol_info, SYMBOL)
+    if info:
+        _symbol = _SymbolCache.from_info(info)
+    return _symbol
+
+_pending_orders = {}
+_retry_after: dict[int, float] = {}
+_retry_delay: dict[int, float] = {}
+ORDER_RETRY_SEC = 5.0
+ORDER_RETRY_MAX_SEC = 120.0
+
+def _collect_order(tag_key) -> bool:
+    fut, side, req = _pending_orders[tag_key]
+    if not fut.done():
+        return False
+    del _pending_orders[tag_key]
+    r = fut.result()
+    if r and r.retcode == _RC_DONE:
+        log.info(f"{side} placed | order={r.order} price={req['price']} sl={req['sl']} tp={req['tp']} vol={req['volume']}")
+        return True
+    reason = getattr(r, "comment", "Unknown")
+    log_once("order_error", f"{side} not placed (retcode={getattr(r,'retcode',None)}): {reason}", min_interval=60.0)
+    delay = _retry_delay.get(tag_key, ORDER_RETRY_SEC)
+    _retry_after[tag_key] = monotonic() + delay
+    _retry_delay[tag_key] = min(delay * 2, ORDER_RETRY_MAX_SEC)
+    return False
 
-def get_rates(symbol: str, timeframe: int, count: int):
-    rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
-    return list(rates) if rates is not None else []
+def get_rates(symbol: str, timeframe: int, date_from: datetime, date_to: datetime):
+    rates = _mt5_call(mt5.copy_rates_range, symbol, timeframe, date_from.astimezone(TZ_UTC), date_to.astimezone(TZ_UTC))
+    return rates if rates is not None else np.empty(0, dtype=_RATES_DTYPE)
 
 def normalize_price(price: float, digits: int) -> float:
     return round(float(price), digits)
@@ -62,37 +149,82 @@ def round_volume(vol: float, step: float, vmin: float, vmax: float = None) -> fl
         v = min(v, vmax)
     return v
 
+BROKER_STATE_TTL_SEC = 0.5
+_broker_state = {}
+
+def fetch_broker_state(symbol: str):
+    cached = _broker_state.get(symbol)
+    now = monotonic()
+    if cached is not None and now - cached[0] < BROKER_STATE_TTL_SEC:
+        return cached[1], cached[2]
+    poss = _mt5_call(mt5.positions_get, symbol=symbol)
+    ords = _mt5_call(mt5.orders_get, symbol=symbol)
+    _broker_state[symbol] = (now, poss, ords)
+    return poss, ords
+
+_traded_cache: dict[int, bool] = {}
+_traded_last_check: dict[int, float] = {}
+TRADED_RECHECK_SEC = 30.0
+
 def already_traded_today(tag_key: int) -> bool:
-    poss = mt5.positions_get(symbol=SYMBOL)
-    if poss:
-        for p in poss:
-            if getattr(p, "magic", 0) == MAGIC and str(tag_key) in getattr(p, "comment", ""):
-                return True
-    ords = mt5.orders_get(symbol=SYMBOL)
-    if ords:
-        for o in ords:
-            if getattr(o, "magic", 0) == MAGIC and str(tag_key) in getattr(o, "comment", ""):
-                return True
-    now_ldn = datetime.now(TZ_LONDON)
-    now_utc = datetime.utcnow().replace(tzinfo=TZ_UTC).replace(tzinfo=None)
-    start_utc = (datetime.utcnow() - timedelta(days=5)).replace(tzinfo=None)
-    deals = mt5.history_deals_get(start_utc, now_utc)
-    if deals:
-        for d in deals:
-            if getattr(d, "symbol", "") == SYMBOL and getattr(d, "magic", 0) == MAGIC and str(tag_key) in getattr(d, "comment", ""):
-                return True
+    if _traded_cache.get(tag_key):
+        return True
+    now = monotonic()
+    if now - _traded_last_check.get(tag_key, float("-inf")) < TRADED_RECHECK_SEC:
+        return False
+    _traded_last_check[tag_key] = now
+    if _scan_traded(tag_key):
+        _traded_cache[tag_key] = True
+        return True
     return False
 
+def _scan_traded(tag_key: int) -> bool:
+    needle = f"ORB{tag_key}"
+    poss, ords = fetch_broker_state(SYMBOL)
+    if poss and any(getattr(p, "magic", 0) == MAGIC and getattr(p, "comment", "").startswith(needle) for p in poss):
+        return True
+    if ords and any(getattr(o, "magic", 0) == MAGIC and getattr(o, "comment", "").startswith(needle) for o in ords):
+        return True
+
+    day_start, _ = london_today_bounds()
+    deals = _mt5_call(mt5.history_deals_get, int(day_start.timestamp()), int(time.time()))
+    return bool(deals) and any(
+        getattr(d, "symbol", "") == SYMBOL and getattr(d, "magic", 0) == MAGIC and getattr(d, "comment", "").startswith(needle)
+        for d in deals
+    )
+
+DONE_LOG_PATH = "orb_done.log"
+
+def load_done_days(path: str = DONE_LOG_PATH) -> set:
+    days = set()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    days.add(int(line))
+                except ValueError:
+                    log.warning(f"Ignoring unreadable line in {path}: {line.strip()!r}")
+    except FileNotFoundError:
+        pass
+    return days
+
+def mark_day_done(tag_key: int, path: str = DONE_LOG_PATH):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"{tag_key}\n")
+
 def cancel_gtd_orders_for_symbol(tag_prefix=None):
-    ords = mt5.orders_get(symbol=SYMBOL)
+    _, ords = fetch_broker_state(SYMBOL)
     if not ords:
         return
+    _broker_state.pop(SYMBOL, None)
     for o in ords:
         if getattr(o, "magic", 0) != MAGIC:
             continue
-        if tag_prefix and tag_prefix not in getattr(o, "comment", ""):
+        if tag_prefix and not getattr(o, "comment", "").startswith(tag_prefix):
             continue
-        mt5.order_delete(o.ticket)
+        _mt5_call(mt5.order_delete, o.ticket)
 
 
 def london_now():
@@ -104,8 +236,15 @@ def london_today_bounds():
     day_end   = day_start + timedelta(days=1)
     return day_start, day_end
 
+_session_cache: tuple[date, tuple] | None = None
+
 def session_window():
-    day_start, _ = london_today_bounds()
+    global _session_cache
+    today = london_now().date()
+    if _session_cache and _session_cache[0] == today:
+        return _session_cache[1]
+
+    day_start = datetime.combine(today, dtime(0, 0), TZ_LONDON)
     tag_key = int(day_start.strftime("%Y%m%d"))
 
     if USE_NY_OPEN:
@@ -116,25 +255,23 @@ def session_window():
 
     orb_end = orb_start + timedelta(minutes=ORB_MINUTES)
     t_expire = datetime.combine(day_start.date(), dtime(23, 59), TZ_LONDON)
-    return orb_start, orb_end, t_expire, tag_key
+    orb_start_epoch = int(orb_start.timestamp())
+    orb_end_epoch   = int(orb_end.timestamp())
+    window = (orb_start, orb_end, t_expire, tag_key, orb_start_epoch, orb_end_epoch)
+    _session_cache = (today, window)
+    return window
 
-
-def to_london_from_epoch_utc(epoch_seconds: int) -> datetime:
-    return datetime.fromtimestamp(int(epoch_seconds), TZ_UTC).astimezone(TZ_LONDON)
-
-def compute_orb(m5_bars, orb_start_dt: datetime, orb_end_dt: datetime):
-    sel = []
-    for r in m5_bars:
-        t_ldn = to_london_from_epoch_utc(r["time"])
-        if orb_start_dt <= t_ldn < orb_end_dt:
-            sel.append(r)
+def compute_orb(m5_bars, orb_start_epoch: int, orb_end_epoch: int):
+    times = m5_bars["time"]
+    sel = m5_bars[(times >= orb_start_epoch) & (times < orb_end_epoch)]
 
     need = max(2, ORB_MINUTES // 5)
-    if len(sel) < need:
+    if sel.size < need:
         return None, None
 
-    hi = max(b["high"] for b in sel)
-    lo = min(b["low"] for b in sel)
+    hi = float(sel["high"].max())
+    lo = float(sel["low"].min())
+
     if hi <= lo:
         return None, None
     return hi, lo
@@ -149,44 +286,63 @@ def range_is_sane(orb_high, orb_low, point):
         return False
     return True
 
-def fixed_volume(info) -> float:
-    vmin  = info.volume_min
-    vstep = info.volume_step
-    vmax  = getattr(info, "volume_max", None)
-    return round_volume(FIXED_VOLUME, vstep, vmin, vmax)
+def fixed_volume(info: _SymbolCache) -> float:
+    return round_volume(FIXED_VOLUME, info.volume_step, info.volume_min, info.volume_max)
+
+_ORDER_TEMPLATE = {
+    "action": _ACT_PENDING,
+    "symbol": SYMBOL,
+    "deviation": DEVIATION,
+    "magic": MAGIC,
+}
+
+def _build_req(order_type, entry, sl, tp, volume, digits, comment, type_time, filling_mode, expiration=None) -> dict:
+    req = _ORDER_TEMPLATE.copy()
+    req.update(
+        volume=volume,
+        type=order_type,
+        price=normalize_price(entry, digits),
+        sl=normalize_price(sl, digits),
+        tp=normalize_price(tp, digits),
+        comment=comment,
+        type_time=type_time,
+        type_filling=filling_mode,
+    )
+    if expiration:
+        req["expiration"] = expiration
+    return req
+
+def place_orb_breakout(info, tick, orb_high, orb_low, rr=RR, tag_key=None, t_expire=None):
+    if tag_key in _pending_orders:
+        return _collect_order(tag_key)
+    if monotonic() < _retry_after.get(tag_key, 0.0):
+        return False
 
-def place_orb_breakout(orb_high, orb_low, rr=RR, tag_key=None, t_expire=None):
-    info = mt5.symbol_info(SYMBOL)
-    tick = mt5.symbol_info_tick(SYMBOL)
     if not info or not tick:
         log.warning("No symbol info/tick.")
         return False
 
     digits = info.digits
-    point  = info.point
     rng    = orb_high - orb_low
     if rng <= 0:
         log.warning("Invalid ORB range.")
         return False
 
-    stops_gap  = (info.trade_stops_level  or 0) * point
-    freeze_gap = (info.trade_freeze_level or 0) * point
-    pend_gap   = max(stops_gap, freeze_gap)
-    tiny       = max(2 * point, 0.0)
-    buf        = (BREAK_BUFFER_POINTS or 0) * point
+    stops_gap = info.stops_gap
+    pend_gap  = info.pend_gap
+    tiny      = info.tiny
+    buf       = info.buf
 
     breaking_up   = tick.ask >= (orb_high + buf)
     breaking_down = tick.bid <= (orb_low  - buf)
 
     tag = f"ORB{tag_key}" if tag_key else "ORB"
-    filling_mode = getattr(info, "filling_mode", mt5.ORDER_FILLING_RETURN) or mt5.ORDER_FILLING_RETURN
 
-    type_time = mt5.ORDER_TIME_GTC
-    req_extra = {}
+    type_time = _TIME_GTC
+    exp_ts = None
     if t_expire:
         exp_ts = int(t_expire.astimezone(TZ_UTC).timestamp())
-        type_time = mt5.ORDER_TIME_SPECIFIED
-        req_extra["expiration"] = exp_ts
+        type_time = _TIME_SPEC
 
     if breaking_up:
         entry = max(orb_high + buf, tick.ask + pend_gap + tiny)
@@ -196,35 +352,9 @@ def place_orb_breakout(orb_high, orb_low, rr=RR, tag_key=None, t_expire=None):
 
         risk = max(entry - sl, stops_gap + tiny)
         tp   = entry + max(rr * risk, (stops_gap + tiny))
+        order_type, side = _BUY_STOP, "BUY STOP"
 
-        volume = fixed_volume(info)
-
-        req = {
-            "action": mt5.TRADE_ACTION_PENDING,
-            "symbol": SYMBOL,
-            "volume": volume,
-            "type": mt5.ORDER_TYPE_BUY_STOP,
-            "price": normalize_price(entry, digits),
-            "sl":    normalize_price(sl, digits),
-            "tp":    normalize_price(tp, digits),
-            "deviation": DEVIATION,
-            "magic": MAGIC,
-            "comment": f"{tag}_RR{rr}",
-            "type_time": type_time,
-            "type_filling": filling_mode,
-            **req_extra,
-        }
-        r = mt5.order_send(req)
-        if r and r.retcode == mt5.TRADE_RETCODE_DONE:
-            log.info(f"BUY STOP placed | order={r.order} price={req['price']} sl={req['sl']} tp={req['tp']} vol={volume}")
-            return True
-        else:
-            reason = getattr(r, "comment", "Unknown")
-            log_once("order_error", f"BUY STOP not placed (retcode={getattr(r,'retcode',None)}): {reason}", min_interval=60.0)
-            time.sleep(1.0)  
-            return False
-
-    if breaking_down:
+    elif breaking_down:
         entry = min(orb_low - buf, tick.bid - pend_gap - tiny)
         sl    = orb_high
         if sl < entry + (stops_gap + tiny):
@@ -232,73 +362,79 @@ def place_orb_breakout(orb_high, orb_low, rr=RR, tag_key=None, t_expire=None):
 
         risk = max(sl - entry, stops_gap + tiny)
         tp   = entry - max(rr * risk, (stops_gap + tiny))
+        order_type, side = _SELL_STOP, "SELL STOP"
 
-        volume = fixed_volume(info)
-
-        req = {
-            "action": mt5.TRADE_ACTION_PENDING,
-            "symbol": SYMBOL,
-            "volume": volume,
-            "type": mt5.ORDER_TYPE_SELL_STOP,
-            "price": normalize_price(entry, digits),
-            "sl":    normalize_price(sl, digits),
-            "tp":    normalize_price(tp, digits),
-            "deviation": DEVIATION,
-            "magic": MAGIC,
-            "comment": f"{tag}_RR{rr}",
-            "type_time": type_time,
-            "type_filling": filling_mode,
-            **req_extra,
-        }
-        r = mt5.order_send(req)
-        if r and r.retcode == mt5.TRADE_RETCODE_DONE:
-            log.info(f"SELL STOP placed | order={r.order} price={req['price']} sl={req['sl']} tp={req['tp']} vol={volume}")
-            return True
-        else:
-            reason = getattr(r, "comment", "Unknown")
-            log_once("order_error", f"SELL STOP not placed (retcode={getattr(r,'retcode',None)}): {reason}", min_interval=60.0)
-            time.sleep(1.0)
-            return False
-
-    log_once("placement", "No break yet; inside range or blocked by broker distances.", min_interval=60.0)
-    return False
+    else:
+        log_once("placement", "No break yet; inside range or blocked by broker distances.", min_interval=60.0)
+        return False
+
+    req = _build_req(order_type, entry, sl, tp, fixed_volume(info), digits,
+                     f"{tag}_RR{rr}", type_time, info.filling_mode, exp_ts)
+    _pending_orders[tag_key] = (submit_order_send(req), side, req)
+    return _collect_order(tag_key)
+
+@dataclass(slots=True)
+class SessionState:
+    tag_key: int | None = None
+    done: bool = False
+    hi: float | None = None
+    lo: float | None = None
+    high_thresh: float | None = None
+    low_thresh: float | None = None
+    orb_start_epoch: int = 0
+    orb_end_epoch: int = 0
+
+INFO_REFRESH_SEC = 300.0
+IDLE_SLEEP_SEC = 30.0
+
+def poll_delay(now_ldn: datetime, orb_start: datetime, orb_end: datetime) -> float:
+    if now_ldn < orb_start - timedelta(seconds=60):
+        return min(60.0, (orb_start - now_ldn).total_seconds() - 60)
+    if now_ldn < orb_end:
+        return 5.0
+    return 0.5
+
+def _record_placed(state: SessionState, done_days: set, tag_key: int):
+    log.info(f"Placed ORB order for session {tag_key}.")
+    state.done = True
+    done_days.add(tag_key)
+    mark_day_done(tag_key)
 
 def main_loop():
     info = ensure_connected()
+    info_ts = monotonic()
     log.info(f"Running ORB bot on {SYMBOL} | RR={RR} | ORB {ORB_MINUTES}m | NY_open={USE_NY_OPEN} | vol={FIXED_VOLUME}")
 
-    last_session_key = None
-    orb_done_this_day = False
-    orb_high = None
-    orb_low  = None
+    done_days = load_done_days()
+    state = SessionState()
 
     while True:
         try:
-            orb_start, orb_end, t_expire, tag_key = session_window()
+            orb_start, orb_end, t_expire, tag_key, orb_start_epoch, orb_end_epoch = session_window()
 
-            if last_session_key != tag_key:
+            if state.tag_key != tag_key:
                 log.info(f"=== New Session {tag_key} (London) ===")
                 log.info(f"ORB window: {orb_start.strftime('%H:%M %Z')}–{orb_end.strftime('%H:%M %Z')}")
-                last_session_key = tag_key
-                orb_done_this_day = False
-                orb_high = None
-                orb_low  = None
+                state = SessionState(tag_key=tag_key, orb_start_epoch=orb_start_epoch, orb_end_epoch=orb_end_epoch)
                 cancel_gtd_orders_for_symbol(tag_prefix=f"ORB{tag_key}")
 
-            if orb_done_this_day or already_traded_today(tag_key):
-                time.sleep(5)
-                continue
+            now_ldn = london_now()
 
-            m5 = get_rates(SYMBOL, mt5.TIMEFRAME_M5, 500)
-            if len(m5) < 20:
-                time.sleep(1)
+            if tag_key in _pending_orders:
+                if _collect_order(tag_key):
+                    _record_placed(state, done_days, tag_key)
+                time.sleep(poll_delay(now_ldn, orb_start, orb_end))
                 continue
 
-            now_ldn = london_now()
+            if state.done or tag_key in done_days or already_traded_today(tag_key):
+                time.sleep(IDLE_SLEEP_SEC)
+                continue
 
             if now_ldn < orb_end:
-                hi, lo = compute_orb(m5, orb_start, orb_end)
-                orb_high, orb_low = hi, lo
+                hi, lo = None, None
+                if now_ldn >= orb_start:
+                    m5 = get_rates(SYMBOL, mt5.TIMEFRAME_M5, orb_start, orb_end)
+                    hi, lo = compute_orb(m5, state.orb_start_epoch, state.orb_end_epoch)
                 if hi and lo:
                     log_once(
                         "building_orb",
@@ -311,38 +447,61 @@ def main_loop():
                         f"Waiting for ORB window bars... ({orb_start.strftime('%H:%M %Z')}–{orb_end.strftime('%H:%M %Z')})",
                         min_interval=120.0
                     )
-                time.sleep(5)
+                time.sleep(poll_delay(now_ldn, orb_start, orb_end))
                 continue
 
-            if orb_high is None or orb_low is None:
-                hi, lo = compute_orb(m5, orb_start, orb_end)
-                orb_high, orb_low = hi, lo
-                if orb_high is None or orb_low is None:
+            # The window has closed, so the ORB is computed once and reused
+            # for the rest of the session.
+            if state.hi is None or state.lo is None:
+                m5 = get_rates(SYMBOL, mt5.TIMEFRAME_M5, orb_start, orb_end)
+                state.hi, state.lo = compute_orb(m5, state.orb_start_epoch, state.orb_end_epoch)
+                if state.hi is None or state.lo is None:
                     log_once("no_orb", "No valid ORB computed; waiting.", min_interval=60.0)
                     time.sleep(5)
                     continue
-
-            if not range_is_sane(orb_high, orb_low, info.point):
+                state.high_thresh = state.hi + info.buf
+                state.low_thresh  = state.lo - info.buf
+            if not range_is_sane(state.hi, state.lo, info.point):
                 log.info("ORB range outside sanity limits; skipping today.")
-                orb_done_this_day = True
+                state.done = True
                 time.sleep(5)
                 continue
 
             if now_ldn > (orb_end + timedelta(minutes=MAX_WAIT_AFTER_BREAK_MIN)):
                 log.info("Post-break window timeout. Skipping today.")
-                orb_done_this_day = True
+                state.done = True
                 time.sleep(5)
                 continue
 
-            placed = place_orb_breakout(orb_high, orb_low, rr=RR, tag_key=tag_key, t_expire=t_expire)
+            if monotonic() - info_ts >= INFO_REFRESH_SEC:
+                info = refresh_symbol_cache()
+                info_ts = monotonic()
+            tick = _mt5_call(mt5.symbol_info_tick, SYMBOL)
+            if not tick:
+                log_once("no_tick", "No symbol tick; waiting.", level=logging.WARNING, min_interval=60.0)
+                time.sleep(poll_delay(now_ldn, orb_start, orb_end))
+                continue
+            if tick.ask < state.high_thresh and tick.bid > state.low_thresh:
+                log_once("placement", "No break yet; inside range or blocked by broker distances.", min_interval=60.0)
+                time.sleep(poll_delay(now_ldn, orb_start, orb_end))
+                continue
+
+            placed = place_orb_breakout(info, tick, state.hi, state.lo, rr=RR, tag_key=tag_key, t_expire=t_expire)
             if placed:
-                log.info(f"Placed ORB order for session {tag_key}.")
-                orb_done_this_day = True
-            time.sleep(5)
+                _record_placed(state, done_days, tag_key)
+            time.sleep(poll_delay(now_ldn, orb_start, orb_end))
 
         except Exception as e:
             log.error(f"Loop error: {e}")
             time.sleep(3)
+            if any(not fut.done() for fut, _, _ in _pending_orders.values()):
+                continue
+            try:
+                _mt5_call(mt5.shutdown)
+                info = ensure_connected()
+                info_ts = monotonic()
+            except Exception as e:
+                log.error(f"Reconnect failed: {e}")
 
 if __name__ == "__main__":
     main_loop()